@@ -176,7 +176,7 @@ class ArtifactVersionContentsSerializer(serializers.Serializer):
         # Since versions cannot be patched, we can skip uniqueness validation
         if self.instance:
             return urn
-        if ArtifactVersion.objects.filter(contents_urn__iexact=urn).exists():
+        if ArtifactVersion.objects.filter(contents_urn__lower=urn.lower()).exists():
             raise ConflictError(f"Version with contents {urn} already exists.")
         # TODO check if this is a valid resource
         return urn
@@ -797,9 +797,12 @@ class ArtifactVersionMigrationSerializer(serializers.ModelSerializer):
             message="Submitted.",
             source_urn=version.contents_urn,
         )
-        artifact_version_migration_executor.submit(
-            lambda: migrate_artifact_version(migration)
-        )
+        if settings.ARTIFACT_VERSION_MIGRATIONS_SYNC:
+            migrate_artifact_version(migration)
+        else:
+            artifact_version_migration_executor.submit(
+                lambda: migrate_artifact_version(migration)
+            )
         return migration
 
     def validate_backend(self, backend: str) -> str:
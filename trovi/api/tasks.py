@@ -11,6 +11,7 @@ from django.utils import timezone
 
 from trovi.models import ArtifactVersionMigration
 from trovi.storage.backends import get_backend
+from util.urn import parse_contents_urn
 
 LOG = logging.getLogger(__name__)
 
@@ -92,9 +93,9 @@ def migrate_artifact_version(migration: ArtifactVersionMigration):
     source = migration.source_urn
     version = migration.artifact_version
     # urn:trovi:contents:<backend>:<id>
-    source_backend_name, source_id = source.split(":")[3:5]
+    source_info = parse_contents_urn(source)
     source_backend = get_backend(
-        source_backend_name, content_id=source_id, version=version
+        source_info["provider"], content_id=source_info["id"], version=version
     )
     dest_backend = get_backend(
         dest_backend_name,
@@ -148,7 +149,8 @@ def migrate_artifact_version(migration: ArtifactVersionMigration):
         LOG.info(f"Finished migration: {source} to {version.contents_urn}")
 
         # New threads get their own DB connection which has to be manually closed
-        db.connection.close()
+        if not settings.ARTIFACT_VERSION_MIGRATIONS_SYNC:
+            db.connection.close()
 
 
 # The functions below handle events that could not execute properly due to a
@@ -6,6 +6,7 @@ import uuid
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, Q
 from django.http import JsonResponse
 from django.test import TestCase, override_settings, SimpleTestCase
 from django.utils import timezone
@@ -34,6 +35,7 @@ from trovi.models import (
     ArtifactTag,
     ArtifactVersion,
     ArtifactRole,
+    ArtifactEvent,
 )
 from util.decorators import timed_lru_cache
 from util.test import (
@@ -57,8 +59,11 @@ class APITest(SimpleTestCase):
         )
         return {"request": request, "view": None}
 
+    @classmethod
     @timed_lru_cache(timeout=settings.AUTH_TROVI_TOKEN_LIFESPAN_SECONDS)
-    def get_test_token(self, scope: str = None) -> str:
+    def get_test_token(cls, scope: str = None) -> str:
+        # Cached per class rather than per instance, since every test method runs on
+        # a new instance, and minting a token requires a round-trip to Keycloak
         provider_name = "CHAMELEON_KEYCLOAK"
         keycloak = get_client_by_name(provider_name)
         test_username = os.getenv(f"{provider_name}_TEST_USER_USERNAME")
@@ -72,7 +77,7 @@ class APITest(SimpleTestCase):
 
         requesting_scope = scope if scope else JWT.Scopes.ARTIFACTS_READ
 
-        response = self.client.post(
+        response = cls.client_class().post(
             reverse("TokenGrant"),
             content_type="application/json",
             data={
@@ -86,9 +91,9 @@ class APITest(SimpleTestCase):
         body = response.json()
 
         if response.status_code != status.HTTP_201_CREATED:
-            self.fail(json.dumps(body))
+            raise cls.failureException(json.dumps(body))
 
-        return response.json()["access_token"]
+        return body["access_token"]
 
     def authenticate_url(self, url: str, scopes: list[JWT.Scopes] = None) -> str:
         scopes = scopes or [JWT.Scopes.ARTIFACTS_READ]
@@ -1401,3 +1406,37 @@ class TestUnassignArtifactRole(TestCase, APITest):
             status.HTTP_403_FORBIDDEN,
             "Unassigned admin role from owner",
         )
+
+
+class TestSampleData(TestCase):
+    """
+    The test runner bulk inserts the sample data, which skips the signals that set
+    version slugs and artifact access counts. These check the values the runner
+    fills in instead against what the models themselves produce.
+    """
+
+    def test_access_counts(self):
+        # Every launch event adds one to its artifact's access count
+        launches = Count(
+            "versions__events",
+            filter=Q(versions__events__event_type=ArtifactEvent.EventType.LAUNCH),
+        )
+        miscounted = Artifact.objects.annotate(launches=launches).exclude(
+            access_count=F("launches")
+        )
+        self.assertFalse(
+            miscounted.exists(),
+            msg=list(miscounted.values_list("uuid", "access_count", "launches")),
+        )
+
+    def test_slugs(self):
+        # The last version created on a day is numbered after all the others from
+        # that day, so regenerating its slug must give the same slug
+        last_versions = {}
+        for version in ArtifactVersion.objects.order_by("id"):
+            last_versions[version.artifact_id, version.created_at.date()] = version
+        for version in last_versions.values():
+            expected_slug = version.slug
+            ArtifactVersion.objects.filter(pk=version.pk).update(slug="")
+            ArtifactVersion.generate_slug(version, created=True)
+            self.assertEqual(version.slug, expected_slug)
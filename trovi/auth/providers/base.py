@@ -173,6 +173,10 @@ class IdentityProviderClient(ABC):
         cond=lambda keys: isinstance(keys, list)
         and all(isinstance(k, Key) for k in keys),
         wait=settings.AUTH_IDP_SIGNING_KEY_REFRESH_RETRY_SECONDS,
+        # Requests wait on this while they're being authenticated, so the waits don't
+        # grow between attempts
+        backoff=1,
+        max_wait=settings.AUTH_IDP_SIGNING_KEY_REFRESH_RETRY_SECONDS,
         msg="Failed to refresh token signing key from Identity Provider.",
     )
     def signing_keys(self) -> list[Key]:
@@ -25,6 +25,9 @@ class TroviAPIViewSet(viewsets.GenericViewSet):
     create_permission_classes: list[Type[permissions.BasePermission]] = []
     update_permission_classes: list[Type[permissions.BasePermission]] = []
     destroy_permission_classes: list[Type[permissions.BasePermission]] = []
+    # Whether rows fetched for writes and listings are locked until the request's
+    # transaction ends. Views which never need to lock rows can turn this off.
+    lock_rows: bool = True
 
     def get_permissions(self) -> list[Type[permissions.BasePermission]]:
         action_permissions = []
@@ -69,7 +72,12 @@ class TroviAPIViewSet(viewsets.GenericViewSet):
         # This override ensures relevant objects in the database to maintain the same
         # state for any operations which require that behavior.
         qs = super(TroviAPIViewSet, self).get_queryset()
-        if self.action.lower() in ("list", "create", "update", "partial_update"):
+        if self.lock_rows and self.action.lower() in (
+            "list",
+            "create",
+            "update",
+            "partial_update",
+        ):
             qs = qs.select_for_update()
         return qs
 
@@ -4,6 +4,7 @@ from typing import Any, Optional
 from django.core import validators
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
@@ -35,3 +36,11 @@ class URNField(models.CharField):
             return value
         else:
             return super(URNField, self).to_python(value)
+
+
+# URNs are matched case-insensitively by comparing ``__lower`` against a lowercased
+# value, which matches the expression of the Lower(urn) indexes. ``__iexact`` compiles
+# to UPPER() or LIKE comparisons depending on the database, which those indexes can't
+# serve. This only helps on databases with expression indexes: Django doesn't create
+# them on MariaDB, where neither lookup is indexed.
+URNField.register_lookup(Lower)
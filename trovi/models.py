@@ -251,14 +251,25 @@ class ArtifactVersion(models.Model):
             .count()
         )
 
+    @property
+    def contents_urn_info(self) -> dict[str, str]:
+        """
+        The parsed components of this version's contents URN. The result is cached
+        on the instance until contents_urn changes.
+        """
+        cached_urn, urn_info = getattr(self, "_contents_urn_info", (None, None))
+        if urn_info is None or cached_urn != self.contents_urn:
+            urn_info = parse_contents_urn(self.contents_urn)
+            self._contents_urn_info = (self.contents_urn, urn_info)
+        return urn_info
+
     def has_doi(self) -> bool:
         """
         Determines if this version has a DOI (Digital Object Identifier), in which
         case it must be treated specially (cannot be deleted)
         """
         # A Zenodo URN should look like "urn:trovi:contents:zenodo:<doi>"
-        urn_info = parse_contents_urn(self.contents_urn)
-        return urn_info["provider"] == "zenodo"
+        return self.contents_urn_info["provider"] == "zenodo"
 
     def can_be_viewed_by(self, token: Optional[JWT]) -> bool:
         """
@@ -74,6 +74,9 @@ CHAMELEON_SWIFT_REGION_NAME = os.getenv("CHAMELEON_SWIFT_REGION_NAME", "CHI@UC")
 
 ZENODO_URL = os.getenv("ZENODO_URL", "https://zenodo.org")
 ZENODO_DEFAULT_ACCESS_TOKEN = os.getenv("ZENODO_DEFAULT_ACCESS_TOKEN")
+ZENODO_REQUEST_WORKERS = int(os.getenv("ZENODO_REQUEST_WORKERS", 4))
+ZENODO_REQUEST_TIMEOUT_SECONDS = 30
+ZENODO_LOOKUP_CACHE_SECONDS = 300
 
 AUTH_TROVI_TOKEN_LIFESPAN_SECONDS = 300
 
@@ -81,6 +84,11 @@ AUTH_TROVI_ADMIN_USERS = set(os.getenv("TROVI_ADMIN_USERS", "").split(","))
 
 ARTIFACT_STORAGE_FILENAME_MAX_LENGTH = 256
 
+# Runs artifact version migrations inline with the request instead of handing them
+# to the migration executor. Only intended to be enabled by tests with
+# override_settings, which can then run inside a regular test transaction.
+ARTIFACT_VERSION_MIGRATIONS_SYNC = False
+
 # Artifact policy
 # Max reproduction requests should ideally never be lowered, only raised.
 # Lowering the value will require complex custom migration logic
@@ -397,3 +405,7 @@ ARTIFACT_AUTHOR_AFFILIATION_MAX_CHARS = 200
 ARTIFACT_LINK_LABEL_MAX_CHARS = 40
 
 STORAGE_BACKEND_AUTH_RETRY_ATTEMPTS = 5
+# Access methods are reused for at most half of a download link's lifespan, so any
+# link that is handed out is still valid for at least the other half
+STORAGE_ACCESS_METHODS_CACHE_SECONDS = AUTH_TROVI_TOKEN_LIFESPAN_SECONDS // 2
+STORAGE_ACCESS_METHODS_CACHE_SIZE = 256
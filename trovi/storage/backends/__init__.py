@@ -9,6 +9,9 @@ from trovi.storage.backends.base import StorageBackend
 from trovi.storage.backends.git import GitBackend
 from trovi.storage.backends.swift import SwiftBackend
 from trovi.storage.backends.zenodo import ZenodoBackend
+from util.decorators import timed_lru_cache
+from util.types import JSON
+from util.urn import parse_contents_urn
 
 # Maps backend names to
 artifact_locks = defaultdict(set)
@@ -56,3 +59,18 @@ def get_backend(
         return GitBackend(name, content_type, content_id=content_id)
     else:
         raise ValidationError(f"Unknown storage backend: {name}")
+
+
+@timed_lru_cache(
+    timeout=settings.STORAGE_ACCESS_METHODS_CACHE_SECONDS,
+    maxsize=settings.STORAGE_ACCESS_METHODS_CACHE_SIZE,
+)
+def get_access_methods(urn: str) -> tuple[dict[str, JSON], ...]:
+    """
+    Retrieves the access methods for stored contents. Generating links requires
+    authenticating with the storage backend, so they are reused for a while
+    for contents which are requested repeatedly.
+    """
+    urn_info = parse_contents_urn(urn)
+    backend = get_backend(urn_info["provider"], content_id=urn_info["id"])
+    return tuple(backend.get_links())
@@ -48,7 +48,8 @@ class StorageBackend(io.BufferedIOBase, ABC):
         self.name = name
         self.content_id = content_id
         self.content_type = content_type
-        self.buffer = bytes()
+        # Writes arrive in chunks, so the buffer is mutable to make appends cheap
+        self.buffer = bytearray()
 
     def to_urn(self) -> str:
         """
@@ -165,7 +166,8 @@ class StorageBackend(io.BufferedIOBase, ABC):
     def read(self, __size: int | None = ...) -> bytes:
         if not self.buffer:
             self.download()
-        chunk = self.buffer[self.bytes_read : __size]
+        # Slicing the buffer gives a bytearray, but callers expect immutable bytes
+        chunk = bytes(self.buffer[self.bytes_read : __size])
         self.bytes_read = min(len(self.buffer), self.bytes_read + __size)
         return chunk
 
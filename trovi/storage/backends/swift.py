@@ -58,7 +58,7 @@ class SwiftBackend(StorageBackend):
         self.content_id = content_id
         self.adapter_kwargs = kwargs
 
-        self.buffer = bytes()
+        self.buffer = bytearray()
 
         self.container_path = f"/{self.container}"
 
@@ -151,7 +151,8 @@ class SwiftBackend(StorageBackend):
         if not response.ok:
             raise IOError(f"Failed to read content {self.to_urn()}")
 
-        self.buffer = response.content
+        # The buffer is a bytearray on every path, so reads and writes behave the same
+        self.buffer = bytearray(response.content)
 
     def get_temporary_download_url(self) -> Optional[HttpDownloadLink]:
         path = self.object_path
@@ -1,27 +1,77 @@
 from __future__ import annotations
 
+import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION, Future
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Callable
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
 from requests import Response
+from requests.adapters import HTTPAdapter
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 
-from trovi.models import ArtifactVersion
+from trovi.models import ArtifactVersion, ArtifactTag, ArtifactAuthor
 from trovi.storage.backends import StorageBackend
 from trovi.storage.links.http import HttpDownloadLink
 from util.types import JSON, ReadableBuffer
 
+try:
+    # orjson is considerably faster, but is not required
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+    def json_dumps(obj: JSON) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
 LOG = logging.getLogger(__name__)
 
 ZENODO_URL = settings.ZENODO_URL
 
+ZENODO_DOI_PATTERN = re.compile(r"10\.[0-9]+/zenodo\.[0-9]+$")
+
+# Shared by all backend instances so that connections to Zenodo are pooled and
+# kept alive across uploads, rather than re-established for every request
+_SESSION = requests.Session()
+# The adapter is only used for Zenodo's host, so it only needs to cache one host's
+# connection pool (pool_connections). That pool keeps up to one connection per worker
+# (pool_maxsize), so concurrent requests can reuse connections rather than opening
+# ones which are discarded afterwards.
+_SESSION.mount(
+    ZENODO_URL,
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.ZENODO_REQUEST_WORKERS,
+    ),
+)
+# Zenodo may only respond long after a large file has been sent, or while it publishes
+# a record, so those requests only time out while connecting, not while reading
+TRANSFER_TIMEOUT = (settings.ZENODO_REQUEST_TIMEOUT_SECONDS, None)
+# Independent requests (e.g. file deletions) are dispatched concurrently on this pool
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.ZENODO_REQUEST_WORKERS, thread_name_prefix="trovi-zenodo"
+)
+
 
 class DepositionMetadata:
+    __slots__ = (
+        "title",
+        "description",
+        "creators",
+        "upload_type",
+        "publication_type",
+        "publication_date",
+        "communities",
+        "keywords",
+    )
+
     def __init__(
         self,
         title: str = None,
@@ -55,9 +105,8 @@ class DepositionMetadata:
                 ],
                 "upload_type": self.upload_type,
                 "publication_type": self.publication_type,
-                "publication_date": (
-                    datetime.strftime(self.publication_date, "%Y-%m-%d")
-                ),
+                # YYYY-MM-DD
+                "publication_date": self.publication_date.date().isoformat(),
                 "communities": self.communities or [],
                 "keywords": self.keywords or [],
             },
@@ -66,7 +115,8 @@ class DepositionMetadata:
     @classmethod
     def from_version(cls, artifact_version: ArtifactVersion):
         artifact = artifact_version.artifact
-        keywords = ["chameleon"].extend([str(label) for label in artifact.tags.all()])
+        # .all() is used here so prefetched tags and authors are not queried again
+        keywords = ["chameleon", *(t.tag for t in artifact.tags.all())]
         return cls(
             title=artifact.title,
             description=artifact.short_description,
@@ -96,9 +146,32 @@ class ZenodoBackend(StorageBackend):
         super(ZenodoBackend, self).__init__(name, *args, **kwargs)
         self.access_token = settings.ZENODO_DEFAULT_ACCESS_TOKEN
         self.version = version
+        self.session = _SESSION
         if not self.content_id:
             if version.has_doi():
-                self.content_id = version.contents_urn.split(":")[-1]
+                self.content_id = version.contents_urn_info["id"]
+
+    def open(self):
+        super(ZenodoBackend, self).open()
+        if self.version.pk:
+            # Load everything needed for the deposition metadata up front,
+            # rather than one query per relation
+            self.version = (
+                ArtifactVersion.objects.select_related("artifact")
+                .prefetch_related(
+                    Prefetch(
+                        "artifact__tags",
+                        queryset=ArtifactTag.objects.only("tag"),
+                    ),
+                    Prefetch(
+                        "artifact__authors",
+                        queryset=ArtifactAuthor.objects.only(
+                            "artifact", "full_name", "affiliation"
+                        ),
+                    ),
+                )
+                .get(pk=self.version.pk)
+            )
 
     def update_length(self) -> int:
         if not self.content_id:
@@ -128,13 +201,14 @@ class ZenodoBackend(StorageBackend):
     def writable(self) -> bool:
         return not self.closed
 
-    def to_record(self) -> str:
-        if not self.content_id:
+    def to_record(self, doi: str = None) -> str:
+        doi = doi or self.content_id
+        if not doi:
             raise ValueError("No DOI provided")
-        elif not re.match(r"10\.[0-9]+/zenodo\.[0-9]+$", self.content_id):
+        elif not ZENODO_DOI_PATTERN.match(doi):
             raise ValueError("DOI is invalid (wrong format)")
         else:
-            return self.content_id.split(".")[-1]
+            return doi.rpartition(".")[2]
 
     def get_files(self) -> JSON:
         record = self.to_record()
@@ -148,10 +222,14 @@ class ZenodoBackend(StorageBackend):
         headers = kwargs.pop("headers", {"accept": "application/json"})
         if self.access_token:
             headers["authorization"] = f"Bearer {self.access_token}"
-        res = requests.request(
+        if "json" in kwargs:
+            kwargs["data"] = json_dumps(kwargs.pop("json"))
+            headers["content-type"] = "application/json"
+        res = self.session.request(
             method=kwargs.pop("method", "GET"),
             url=f"{settings.ZENODO_URL}/api/{path}",
             headers=headers,
+            timeout=kwargs.pop("timeout", settings.ZENODO_REQUEST_TIMEOUT_SECONDS),
             **kwargs,
         )
         if res.status_code > 299:
@@ -162,7 +240,7 @@ class ZenodoBackend(StorageBackend):
         if raw:
             return res
         else:
-            return res.json()
+            return json_loads(res.content)
 
     def create_deposition(
         self, metadata: "DepositionMetadata" = None, file: ReadableBuffer = None
@@ -181,6 +259,7 @@ class ZenodoBackend(StorageBackend):
             self.Endpoint.FILE_UPLOAD.format(deposition_id),
             method="POST",
             files={"file": ("archive.tar.gz", file, "application/tar+gz")},
+            timeout=TRANSFER_TIMEOUT,
         )
 
         LOG.debug("Uploaded file for record {}".format(deposition_id))
@@ -188,6 +267,7 @@ class ZenodoBackend(StorageBackend):
         res_json = self._make_request(
             self.Endpoint.PUBLISH.format(deposition_id),
             method="POST",
+            timeout=TRANSFER_TIMEOUT,
         )
         LOG.debug("Published record {}".format(deposition_id))
 
@@ -204,15 +284,24 @@ class ZenodoBackend(StorageBackend):
                 'Missing required arguments, "metadata", "doi", and "file" are required'
             )
 
-        record = ZenodoBackend.to_record(doi)
+        record = self.to_record(doi)
 
         # Get latest version
-        res_json = self._make_request(
-            self.Endpoint.LOOKUP.format(record),
-            method="GET",
+        # Lookups are cached, since retries and repeated migrations of the same
+        # artifact would otherwise ask Zenodo the same question every time
+        lookup_cache_key = f"zenodo:latest:{record}"
+        latest_url = cache.get_or_set(
+            lookup_cache_key,
+            lambda: self._make_request(
+                self.Endpoint.LOOKUP.format(record),
+                method="GET",
+            )
+            .get("links", {})
+            .get("latest"),
+            timeout=settings.ZENODO_LOOKUP_CACHE_SECONDS,
         )
-        latest_url = res_json.get("links", {}).get("latest")
         if not latest_url:
+            cache.delete(lookup_cache_key)
             raise ValueError(
                 "Could not discover latest version for deposition {}".format(doi)
             )
@@ -241,12 +330,7 @@ class ZenodoBackend(StorageBackend):
         LOG.debug("Updated metadata for record {}".format(draft_record))
 
         # Delete all files first; cannot update in-place
-        for f in res_json.get("files"):
-            self._make_request(
-                self.Endpoint.FILE.format(draft_record, f["id"]),
-                method="DELETE",
-            )
-            LOG.debug("Deleted file {} for record {}".format(f["id"], draft_record))
+        self.delete_files(draft_record, res_json.get("files"))
 
         # Upload file contents
         self._make_request(
@@ -259,6 +343,7 @@ class ZenodoBackend(StorageBackend):
                     "application/tar+gz",
                 )
             },
+            timeout=TRANSFER_TIMEOUT,
         )
 
         LOG.debug("Uploaded file for record {}".format(draft_record))
@@ -267,11 +352,44 @@ class ZenodoBackend(StorageBackend):
         res_json = self._make_request(
             self.Endpoint.PUBLISH.format(draft_record),
             method="POST",
+            timeout=TRANSFER_TIMEOUT,
         )
         LOG.debug("Published record {}".format(draft_record))
+        # The record just published is now the latest version
+        cache.delete(lookup_cache_key)
 
         self.content_id = res_json.get("doi")
 
+    def delete_files(self, record: str, files: list[dict[str, JSON]]):
+        """
+        Deletes files from a draft record. The deletions are independent of each
+        other, so they are all sent at once, and the first failure is raised.
+        """
+
+        def log_deletion(file_id: str) -> Callable[[Future], None]:
+            def callback(future: Future):
+                if not future.cancelled() and not future.exception():
+                    LOG.debug(f"Deleted file {file_id} for record {record}")
+
+            return callback
+
+        deletions = []
+        for f in files:
+            deletion = _EXECUTOR.submit(
+                self._make_request,
+                self.Endpoint.FILE.format(record, f["id"]),
+                method="DELETE",
+            )
+            deletion.add_done_callback(log_deletion(f["id"]))
+            deletions.append(deletion)
+
+        done, not_done = wait(deletions, return_when=FIRST_EXCEPTION)
+        for deletion in not_done:
+            deletion.cancel()
+        for deletion in done:
+            # Re-raises the exception from the failed request, if there is one
+            deletion.result()
+
     def to_record_url(self) -> str:
         record = self.to_record()
         return f"{settings.ZENODO_URL}/records/{record}"
@@ -283,7 +401,11 @@ class ZenodoBackend(StorageBackend):
         zip_url = f"{record_url}/files/archive.zip?download=1"
 
         # See if the tar archive exists
-        tar_response = requests.head(tar_url, allow_redirects=True)
+        tar_response = self.session.head(
+            tar_url,
+            allow_redirects=True,
+            timeout=settings.ZENODO_REQUEST_TIMEOUT_SECONDS,
+        )
         if tar_response.ok:
             download_url = tar_url
         else:
@@ -21,7 +21,30 @@ class StreamingFileUploadHandler(FileUploadHandler):
     """
 
     storage_backend: StorageBackend = None
-    supported_filetypes = {".tar", ".tar.gz"}
+    # Maps each supported file extension to the content type it must be sent with
+    supported_filetypes = {
+        ".tar": "application/tar",
+        ".tar.gz": "application/tar+gz",
+    }
+    supported_content_types = frozenset(supported_filetypes.values())
+
+    def open_storage_backend(
+        self, backend_type: str, content_type: str, content_length: int
+    ) -> bool:
+        """
+        Opens the storage backend for uploads which are large enough to be streamed.
+        Returns True only if the backend was opened by this call.
+        """
+        if (
+            content_length <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+            or self.storage_backend
+        ):
+            return False
+        self.storage_backend = get_backend(backend_type, content_type)
+        if not self.storage_backend.writable():
+            raise ValidationError(f"Backend {backend_type} does not allow uploads.")
+        self.storage_backend.open()
+        return True
 
     def handle_raw_input(
         self,
@@ -31,17 +54,11 @@ class StreamingFileUploadHandler(FileUploadHandler):
         boundary,
         encoding=None,
     ):
-        if (
-            content_length > settings.FILE_UPLOAD_MAX_MEMORY_SIZE
-            and not self.storage_backend
-        ):
-            self.storage_backend = get_backend(
-                (backend_type := input_data.GET.get("backend")),
-                input_data.headers.get("Content-Type"),
-            )
-            if not self.storage_backend.writable():
-                raise ValidationError(f"Backend {backend_type} does not allow uploads.")
-            self.storage_backend.open()
+        self.open_storage_backend(
+            input_data.GET.get("backend"),
+            input_data.headers.get("Content-Type"),
+            content_length,
+        )
 
     def new_file(
         self,
@@ -61,25 +78,20 @@ class StreamingFileUploadHandler(FileUploadHandler):
             content_type_extra=content_type_extra,
         )
         # If the filetype isn't supported, skip it
-        # This is evaluated either by a supported file extension, or a content type
-        # of application/tar(+gz, etc.)
-        if (
-            (full_ext := "".join(exts := Path(file_name).suffixes))
-            not in self.supported_filetypes
-            or content_type != f"application/{'+'.join(e[1:] for e in exts)}"
-        ):
+        # This is evaluated by a supported file extension, which must match a content
+        # type of application/tar(+gz, etc.). The content type is checked first, as
+        # it doesn't require parsing the file name.
+        if content_type not in self.supported_content_types:
+            raise ValidationError(f"Unsupported content type: {content_type}")
+        full_ext = "".join(Path(file_name).suffixes)
+        if self.supported_filetypes.get(full_ext) != content_type:
             raise ValidationError(f"Unsupported file type: {full_ext}")
 
         # If the upload is above a certain threshold, we use this handler to stream
         # the file to remote storage
-        if (
-            content_length > settings.FILE_UPLOAD_MAX_MEMORY_SIZE
-            and not self.storage_backend
+        if self.open_storage_backend(
+            self.request.GET.get("backend"), content_type, content_length
         ):
-            self.storage_backend = get_backend(
-                self.request.GET.get("backend"), content_type
-            )
-            self.storage_backend.open()
             raise StopFutureHandlers
 
     def receive_data_chunk(self, raw_data: bytes, start: int) -> Optional[bytes]:
@@ -1,9 +1,5 @@
-import hashlib
-import hmac
-import random
 from datetime import datetime
 from typing import Union
-from uuid import uuid4
 
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
@@ -13,10 +9,9 @@ from rest_framework.exceptions import ValidationError
 
 from trovi.common.serializers import URNSerializerField
 from trovi.models import ArtifactVersion
-from trovi.storage.backends import get_backend
+from trovi.storage.backends import get_backend, get_access_methods
 from trovi.storage.backends.base import StorageBackend
 from trovi.storage.links.http import HttpDownloadLink
-from util.urn import parse_contents_urn
 
 
 class StorageContentsSerializer(serializers.Serializer):
@@ -29,18 +24,25 @@ class StorageContentsSerializer(serializers.Serializer):
         return validated_data
 
 
+# The example values are fixed, so the generated schema is stable and no
+# random values or signatures have to be computed on import
+example_uuid = "3f1d52d4-2a3b-4c7e-9f0a-6b8e2d1c4a57"
+example_exp = datetime(year=2049, month=7, day=6)
+example_signature = "da39a3ee5e6b4b0d3255bfef95601890afd80709"
+
+
 @extend_schema_serializer(
     examples=[
         OpenApiExample(
             name="Chameleon Swift",
             value={
-                "contents": f"urn:trovi:contents:chameleon:{(example_uuid := uuid4())}",
+                "contents": f"urn:trovi:contents:chameleon:{example_uuid}",
                 "access_methods": [
                     HttpDownloadLink(
-                        exp=(example_exp := datetime(year=2049, month=7, day=6)),
+                        exp=example_exp,
                         url=f"https://example.com/swift/"
                         f"{example_uuid}"
-                        f"?temp_url_sig={hmac.new(bytes([random.randint(0, 10)]), bytes([random.randint(0, 10)]), hashlib.sha1).hexdigest()}"
+                        f"?temp_url_sig={example_signature}"
                         f"&temp_url_exp={example_exp.strftime(settings.DATETIME_FORMAT)}",
                         headers={},
                         method="GET",
@@ -71,7 +73,8 @@ class StorageRequestSerializer(serializers.Serializer):
 
         file = validated_data["file"]
         with backend:
-            backend.write(file.file.read())
+            for chunk in file.chunks():
+                backend.write(chunk)
 
         return backend
 
@@ -111,9 +114,10 @@ class StorageRequestSerializer(serializers.Serializer):
         elif isinstance(instance, ArtifactVersion):
             # RetrieveContents
             urn = instance.contents_urn
-            urn_info = parse_contents_urn(urn)
-            backend = get_backend(urn_info["provider"], content_id=urn_info["id"])
-            return {"contents": {"urn": urn}, "access_methods": backend.get_links()}
+            return {
+                "contents": {"urn": urn},
+                "access_methods": list(get_access_methods(urn)),
+            }
         else:
             raise ValueError(
                 f"Received unexpected data in storage content request: {type(instance)}"
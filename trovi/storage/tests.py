@@ -1,64 +1,81 @@
+import functools
 import io
 import os
-import random
 import tarfile
 import uuid
 from typing import IO
-from unittest import skipIf
-from urllib.parse import urlencode
-from uuid import uuid4
+from unittest import skipUnless
+from unittest.mock import patch
+from urllib.parse import quote
 
 from django.conf import settings
-from django.test import TransactionTestCase, TestCase
+from django.test import TestCase, override_settings
 from requests import Response
 from rest_framework import status
 from rest_framework.reverse import reverse
 
 from trovi.api.tests import APITest
 from trovi.common.tokens import JWT
-from trovi.models import ArtifactVersionMigration, Artifact
+from trovi.models import ArtifactVersionMigration, Artifact, ArtifactVersion
+from trovi.storage.backends import get_access_methods
 from trovi.storage.urls import StoreContents, RetrieveContents
 from util.test import version_don_quixote_1, version_don_quixote_2, artifact_don_quixote
 
+PRODUCTION_ZENODO_URL = "https://zenodo.org"
+
 
 class StorageTest(APITest):
     @staticmethod
-    def get_test_data_gzip(n_bytes: int) -> IO:
+    @functools.lru_cache(maxsize=None)
+    def get_test_data_gzip(n_bytes: int) -> bytes:
+        """
+        Builds a compressed test archive of each size only once
+        """
         tar_buf = io.BytesIO()
-        with tarfile.open(fileobj=tar_buf, mode="w:gz") as tar:
-            file_buf = io.BytesIO(random.randbytes(n_bytes))
-            tar.addfile(tarfile.TarInfo("rand_bytes"), fileobj=file_buf)
-
-        tar_buf.seek(0)
-        out = f"/tmp/trovi-test-{uuid4()}.tar.gz"
-        with open(out, mode="wb") as f:
-            # Test files are automatically cleaned up by the test runner
-            f.write(tar_buf.getvalue())
-        return open(out, mode="rb")
+        # Random bytes are incompressible, so large archives stay large enough to be
+        # streamed to storage, and the fastest compression level loses nothing
+        with tarfile.open(fileobj=tar_buf, mode="w:gz", compresslevel=1) as tar:
+            info = tarfile.TarInfo("rand_bytes")
+            info.size = n_bytes
+            tar.addfile(info, fileobj=io.BytesIO(os.urandom(n_bytes)))
+        return tar_buf.getvalue()
+
+    def get_test_data(self, n_bytes: int) -> IO:
+        data = io.BytesIO(self.get_test_data_gzip(n_bytes))
+        # The name is sent as the filename of the uploaded archive
+        data.name = f"trovi-test-{n_bytes}.tar.gz"
+        return data
 
     @property
     def test_data_small(self) -> IO:
         """
         Returns a 256 byte test archive (before compression)
         """
-        return self.get_test_data_gzip(256)
+        return self.get_test_data(256)
 
     @property
     def test_data_large(self) -> IO:
         """
         Returns a 10 MB test archive (before compression)
         """
-        return self.get_test_data_gzip(10 * 1024 * 1024)
+        return self.get_test_data(10 * 1024 * 1024)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def reverse_contents_path(view_name: str) -> str:
+        # The URL configuration doesn't change during tests, so each path is
+        # only resolved once
+        return reverse(view_name)
 
     def store_contents_path(self, backend: str = "chameleon") -> str:
         return self.authenticate_url(
-            f"{reverse(StoreContents)}?backend={backend}",
+            f"{self.reverse_contents_path(StoreContents)}?backend={backend}",
             scopes=[JWT.Scopes.ARTIFACTS_WRITE],
         )
 
     def retrieve_contents_path(self, urn: str) -> str:
         return self.authenticate_url(
-            f"{reverse(RetrieveContents)}?{urlencode({'urn': urn})}",
+            f"{self.reverse_contents_path(RetrieveContents)}?urn={quote(urn, safe='')}",
             scopes=[JWT.Scopes.ARTIFACTS_READ],
         )
 
@@ -68,13 +85,38 @@ class StorageTest(APITest):
         storage_backend: str = "chameleon",
         compression: str = "gz",
     ) -> Response:
+        # getvalue() doesn't consume the buffer, so the same data can be stored twice
+        payload = data.getvalue() if isinstance(data, io.BytesIO) else data.read()
         return self.client.post(
             self.store_contents_path(backend=storage_backend),
             content_type=f"application/tar+{compression}",
-            data=data.read(),
+            data=payload,
             HTTP_CONTENT_DISPOSITION=f"attachment; filename={data.name}",
         )
 
+    @classmethod
+    def store_don_quixote_contents(cls):
+        """
+        Uploads real contents for both of the sample artifact's versions. This is
+        meant to be called once per class from ``setUpTestData``, rather than before
+        every test. Uploading needs a test client and tokens, which normally only
+        exist on test instances, so a standalone instance does the work.
+        """
+        uploader = cls()
+        uploader.client = cls.client_class()
+        test_data = uploader.test_data_small
+        response1 = uploader.store_content(test_data)
+        response2 = uploader.store_content(test_data)
+        json1 = response1.json()
+        json2 = response2.json()
+        uploader.assertEqual(response1.status_code, status.HTTP_201_CREATED, msg=json1)
+        uploader.assertEqual(response2.status_code, status.HTTP_201_CREATED, msg=json2)
+        version_don_quixote_1.contents_urn = json1["contents"]["urn"]
+        version_don_quixote_2.contents_urn = json2["contents"]["urn"]
+        ArtifactVersion.objects.bulk_update(
+            [version_don_quixote_1, version_don_quixote_2], ["contents_urn"]
+        )
+
 
 class TestStoreContents(TestCase, StorageTest):
     content_uuids = set()
@@ -121,22 +163,9 @@ class TestStoreContents(TestCase, StorageTest):
 
 
 class TestRetrieveContents(TestCase, StorageTest):
-    real_contents_urn = False
-
-    def setUp(self):
-        if not self.real_contents_urn:
-            response1 = self.store_content(self.test_data_small)
-            response2 = self.store_content(self.test_data_small)
-            json1 = response1.json()
-            json2 = response2.json()
-            self.assertEqual(response1.status_code, status.HTTP_201_CREATED, msg=json1)
-            self.assertEqual(response2.status_code, status.HTTP_201_CREATED, msg=json2)
-            version_don_quixote_1.contents_urn = json1["contents"]["urn"]
-            version_don_quixote_2.contents_urn = json2["contents"]["urn"]
-            version_don_quixote_1.save()
-            version_don_quixote_2.save()
-            print(f"SETUP URN {version_don_quixote_1.contents_urn}")
-            self.real_contents_urn = True
+    @classmethod
+    def setUpTestData(cls):
+        cls.store_don_quixote_contents()
 
     def test_endpoint_works(self):
         try:
@@ -184,13 +213,8 @@ class TestRetrieveContents(TestCase, StorageTest):
             self.assertIsInstance(method, dict, msg=as_json)
 
     def test_retrieve_contents_artifact_not_found(self):
+        # A random UUID colliding with an existing artifact is vanishingly unlikely
         fake_uuid = uuid.uuid4()
-        while True:
-            try:
-                Artifact.objects.get(uuid=fake_uuid)
-                fake_uuid = uuid.uuid4()
-            except Artifact.DoesNotExist:
-                break
         response = self.client.get(
             self.authenticate_url(
                 reverse(
@@ -217,9 +241,9 @@ class TestRetrieveContents(TestCase, StorageTest):
         )
 
     def test_retrive_version_contents_private(self):
-        artifact_don_quixote.refresh_from_db()
-        artifact_don_quixote.visibility = Artifact.Visibility.PRIVATE
-        artifact_don_quixote.save()
+        Artifact.objects.filter(pk=artifact_don_quixote.pk).update(
+            visibility=Artifact.Visibility.PRIVATE
+        )
 
         response = self.client.get(
             self.authenticate_url(
@@ -232,11 +256,10 @@ class TestRetrieveContents(TestCase, StorageTest):
         self.assertEqual(response.status_code, status.HTTP_200_OK, msg=response.content)
 
     def test_retrieve_version_contents_private_no_permission(self):
-        artifact_don_quixote.refresh_from_db()
-        artifact_don_quixote.visibility = Artifact.Visibility.PRIVATE
-        for role in artifact_don_quixote.roles.all():
-            role.delete()
-        artifact_don_quixote.save()
+        Artifact.objects.filter(pk=artifact_don_quixote.pk).update(
+            visibility=Artifact.Visibility.PRIVATE
+        )
+        artifact_don_quixote.roles.all().delete()
 
         response = self.client.get(
             self.authenticate_url(
@@ -250,6 +273,79 @@ class TestRetrieveContents(TestCase, StorageTest):
             response.status_code, status.HTTP_403_FORBIDDEN, msg=response.content
         )
 
+    def test_retrieve_contents_archive_redirect(self):
+        urn = version_don_quixote_1.contents_urn
+        response = self.client.get(
+            self.retrieve_contents_path(urn), HTTP_ACCEPT="application/tar+gz"
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_302_FOUND, msg=response.content
+        )
+        # The access methods are cached, so these are the links the view used
+        download_link = next(
+            link
+            for link in get_access_methods(urn)
+            if link["protocol"] == "http" and link["method"] == "GET"
+        )
+        self.assertEqual(response["Location"], download_link["url"])
+
+    def test_retrieve_contents_archive_link_with_headers(self):
+        urn = version_don_quixote_1.contents_urn
+        # Redirects can't send headers, so a link which needs them is only listed
+        links = (
+            {
+                "protocol": "http",
+                "method": "GET",
+                "url": "https://example.com/archive.tar.gz",
+                "headers": {"Authorization": "Bearer foo"},
+            },
+        )
+        with patch("trovi.storage.views.get_access_methods", return_value=links):
+            response = self.client.get(
+                self.retrieve_contents_path(urn), HTTP_ACCEPT="application/tar+gz"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, msg=response.content)
+        self.assertEqual(response.json()["contents"]["urn"], urn)
+
+    def test_retrieve_contents_accept_json(self):
+        urn = version_don_quixote_1.contents_urn
+        response = self.client.get(
+            self.retrieve_contents_path(urn), HTTP_ACCEPT="application/json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, msg=response.content)
+        self.assertEqual(response.json()["contents"]["urn"], urn)
+
+    def test_retrieve_contents_not_modified(self):
+        path = self.retrieve_contents_path(version_don_quixote_1.contents_urn)
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, msg=response.content)
+        self.assertIn("ETag", response)
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_304_NOT_MODIFIED, msg=response.content
+        )
+
+    def test_retrieve_contents_not_modified_no_permission(self):
+        path = self.retrieve_contents_path(version_don_quixote_1.contents_urn)
+        etag = self.client.get(path)["ETag"]
+        Artifact.objects.filter(pk=artifact_don_quixote.pk).update(
+            visibility=Artifact.Visibility.PRIVATE
+        )
+        artifact_don_quixote.roles.all().delete()
+
+        # Permissions are checked before the ETag, so a cached copy isn't confirmed
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_403_FORBIDDEN, msg=response.content
+        )
+
     def test_retrieve_contents_access_methods(self):
         # TODO
         pass
@@ -259,44 +355,27 @@ class TestRetrieveContents(TestCase, StorageTest):
         pass
 
 
-@skipIf(
-    settings.DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3",
-    "Skipping Version Migration test; SQLite has difficulties with transactions.",
+@skipUnless(
+    settings.ZENODO_DEFAULT_ACCESS_TOKEN
+    and settings.ZENODO_URL != PRODUCTION_ZENODO_URL,
+    "Skipping Version Migration test; it publishes to Zenodo. Set ZENODO_URL to a "
+    "Zenodo sandbox and ZENODO_DEFAULT_ACCESS_TOKEN to a token for it to run it.",
 )
-class TestMigrateArtifactVersion(TransactionTestCase, StorageTest):
+@override_settings(ARTIFACT_VERSION_MIGRATIONS_SYNC=True)
+class TestMigrateArtifactVersion(TestCase, StorageTest):
     """
-    Since migrations run in a separate thread, this test class needs to be
-    a little special. The base ``TestCase`` class runs all tests inside a transaction
-    so that when they end, changes to the database are rolled back. This lets you
-    make whatever changes in the test case and still have fresh state for every test.
-    However, this transaction locks the database from other threads, so using this
-    type of test case here results in an infinite hang. Instead, we use
-    a ``TransactionTestCase``, which is designed to test transactions i.e. does not hold
-    its own transaction.
-
-    Special care needs to be directed to two things:
-    1. Only one test can live inside this class. It will fail if the ``setUp`` method
-       is run more than once.
-    2. Significant changes inside these tests should be avoided, as the state will be
-       retained into other tests.
+    Migrations normally run in a separate thread, which would hang on the
+    transaction that ``TestCase`` wraps around each test. With
+    ``ARTIFACT_VERSION_MIGRATIONS_SYNC`` the migration runs inline with the request,
+    so the fixture data can be created once and rolled back after each test.
+
+    The migration publishes a real deposition to Zenodo, so this only runs when
+    a token is provided for a Zenodo instance other than production.
     """
 
-    real_contents_urn = False
-
-    def setUp(self):
-        if not self.real_contents_urn:
-            response1 = self.store_content(self.test_data_small)
-            response2 = self.store_content(self.test_data_small)
-            json1 = response1.json()
-            json2 = response2.json()
-            self.assertEqual(response1.status_code, status.HTTP_201_CREATED, msg=json1)
-            self.assertEqual(response2.status_code, status.HTTP_201_CREATED, msg=json2)
-            version_don_quixote_1.contents_urn = json1["contents"]["urn"]
-            version_don_quixote_2.contents_urn = json2["contents"]["urn"]
-            version_don_quixote_1.save()
-            version_don_quixote_2.save()
-            print(f"SETUP URN {version_don_quixote_1.contents_urn}")
-            self.real_contents_urn = True
+    @classmethod
+    def setUpTestData(cls):
+        cls.store_don_quixote_contents()
 
     def test_migrate_storage(self):
         artifact_don_quixote.refresh_from_db()
@@ -314,12 +393,10 @@ class TestMigrateArtifactVersion(TransactionTestCase, StorageTest):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED, msg=as_json)
 
+        # The migration runs inline, so it has finished by the time we get a response
         migration = version_don_quixote_1.migrations.first()
-        migration_status = ArtifactVersionMigration.MigrationStatus
-        self.assertNotEqual(migration.status, migration_status.ERROR)
-        while migration.status != migration_status.SUCCESS:
-            # This probably deserves a better check.
-            migration.refresh_from_db()
-            self.assertNotEqual(
-                migration.status, migration_status.ERROR, msg=migration.message
-            )
+        self.assertEqual(
+            migration.status,
+            ArtifactVersionMigration.MigrationStatus.SUCCESS,
+            msg=migration.message,
+        )
@@ -1,5 +1,10 @@
-from django.db import transaction
-from django.utils.decorators import method_decorator
+import json
+from hashlib import md5
+
+from django.db.models import QuerySet
+from django.http import HttpResponseRedirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema_view,
@@ -23,6 +28,8 @@ from trovi.common.permissions import (
 from trovi.common.schema import StorageViewSetAutoSchema
 from trovi.common.views import TroviAPIViewSet
 from trovi.models import ArtifactVersion
+from trovi.storage.backends import get_access_methods
+from trovi.storage.handlers import StreamingFileUploadHandler
 from trovi.storage.serializers import StorageRequestSerializer
 
 
@@ -55,7 +62,9 @@ from trovi.storage.serializers import StorageRequestSerializer
         ],
     ),
     list=extend_schema(
-        description="Retrieve metadata about an artifact archive.",
+        description="Retrieve metadata about an artifact archive. If the request "
+        "accepts the archive's content type, it is instead redirected to a download "
+        "link for the archive, when the storage backend provides one.",
         parameters=[
             OpenApiParameter(
                 name="urn",
@@ -69,10 +78,15 @@ from trovi.storage.serializers import StorageRequestSerializer
                 location=OpenApiParameter.HEADER,
                 enum=["application/tar+gz"],
             ),
+            OpenApiParameter(
+                name="accept",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                enum=["application/json", "application/tar", "application/tar+gz"],
+            ),
         ],
     ),
 )
-@method_decorator(transaction.atomic, name="create")
 class StorageViewSet(TroviAPIViewSet, mixins.CreateModelMixin, mixins.ListModelMixin):
     """
     Implements all endpoints at /contents
@@ -90,11 +104,39 @@ class StorageViewSet(TroviAPIViewSet, mixins.CreateModelMixin, mixins.ListModelM
         RootStorageDownloadPermission,
     ]
     serializer_class = StorageRequestSerializer
-    lookup_field = "contents_urn__iexact"
+    lookup_field = "contents_urn__lower"
     lookup_url_kwarg = "urn"
     schema = StorageViewSetAutoSchema()
+    # Retrieving contents only reads a version, and uploading contents doesn't
+    # touch the database at all, so no rows need to be locked. Skipping the
+    # locking also means neither action has to run inside a transaction, which
+    # would otherwise be held open for the whole upload to remote storage.
+    lock_rows = False
+
+    def get_queryset(self) -> QuerySet:
+        # The download permission checks the version's artifact, so it is fetched
+        # in the same query
+        return super(StorageViewSet, self).get_queryset().select_related("artifact")
+
+    def accepts_archive(self, request: Request) -> bool:
+        """
+        Checks whether the client asked for the archive itself rather than its metadata
+        """
+        accepted = {
+            media_type.split(";", 1)[0].strip()
+            for media_type in request.META.get("HTTP_ACCEPT", "").split(",")
+        }
+        return not accepted.isdisjoint(
+            StreamingFileUploadHandler.supported_content_types
+        )
+
+    def perform_content_negotiation(self, request: Request, force: bool = False):
+        # Archive requests are answered with a redirect, which is never rendered,
+        # so they shouldn't be rejected for not accepting JSON
+        if self.action == "list" and self.accepts_archive(request):
+            force = True
+        return super(StorageViewSet, self).perform_content_negotiation(request, force)
 
-    @transaction.atomic
     def list(self, request: Request, *args, **kwargs) -> Response:
         # Because of the weird way this method is implemented as a hack to give it the
         # correct URL path, we have to shove the necessary URL params into self.kwargs
@@ -103,5 +145,28 @@ class StorageViewSet(TroviAPIViewSet, mixins.CreateModelMixin, mixins.ListModelM
         urn = request.query_params.get(self.lookup_url_kwarg)
         if not urn:
             raise ValidationError("Missing required ?urn parameter")
-        self.kwargs[self.lookup_url_kwarg] = urn
-        return mixins.RetrieveModelMixin.retrieve(self, request, *args, **kwargs)
+        self.kwargs[self.lookup_url_kwarg] = urn.lower()
+        version = self.get_object()
+
+        if self.accepts_archive(request):
+            # Clients that want the archive are sent straight to it, which saves them
+            # from parsing the access methods and making another request themselves
+            for link in get_access_methods(version.contents_urn):
+                if link["protocol"] == "http" and link["method"] == "GET":
+                    # Redirects can't carry the extra headers some links require
+                    if not link["headers"]:
+                        return HttpResponseRedirect(link["url"])
+
+        data = self.get_serializer(version).data
+        # Access methods are reused while they are cached, so clients asking for the
+        # same contents again can revalidate rather than receive the same links.
+        # Permissions are checked by get_object() above, before any 304 is sent.
+        etag = quote_etag(
+            md5(
+                json.dumps(data, sort_keys=True).encode(), usedforsecurity=False
+            ).hexdigest()
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified:
+            return not_modified
+        return Response(data, headers={"ETag": etag})
@@ -1,6 +1,6 @@
 import operator
+import random
 import time
-from datetime import datetime, timedelta
 from functools import lru_cache, wraps, partial
 from threading import Lock
 from typing import Callable, Type, Any
@@ -29,31 +29,47 @@ def timed_lru_cache(
 
     def wrapper(f: Callable):
         lock = lock_type()
-        f = lru_cache(maxsize=maxsize, typed=typed)(f)
-        f.delta = timedelta(seconds=timeout)
-        f.expiration = datetime.utcnow() + f.delta
+        cached_f = lru_cache(maxsize=maxsize, typed=typed)(f)
+        # A monotonic clock can't jump with the wall clock and expire entries early
+        expiration = time.monotonic() + timeout
 
         @wraps(f)
         def wrapped(*args, **kwargs):
-            with lock:
-                if (now := datetime.utcnow()) >= f.expiration:
-                    f.cache_clear()
-                    f.expiration = now + f.delta
-                return f(*args, **kwargs)
-
+            nonlocal expiration
+            # lru_cache is already thread-safe, so the lock only guards clearing the
+            # cache, and calls don't wait on each other unless the cache has expired
+            if time.monotonic() >= expiration:
+                with lock:
+                    if (now := time.monotonic()) >= expiration:
+                        cached_f.cache_clear()
+                        expiration = now + timeout
+            return cached_f(*args, **kwargs)
+
+        # Mirror the lru_cache interface, so the cache can be inspected and cleared
+        wrapped.cache_info = cached_f.cache_info
+        wrapped.cache_clear = cached_f.cache_clear
         return wrapped
 
     return wrapper
 
 
 def retry(
-    n: int = 5, cond: Any = True, wait: float = 0, msg: str = "Unknown failure."
+    n: int = 5,
+    cond: Any = True,
+    wait: float = 0,
+    msg: str = "Unknown failure.",
+    backoff: float = 2,
+    max_wait: float = 10,
+    giveup_on: tuple[Type[Exception], ...] = (),
 ) -> Callable:
     """
     Retry a function until it passes a desired condition. The condition can either
     be a value or a callable, which evaluates the function's return itself.
 
-    By default, retries 5 times and doesn't wait between retries.
+    By default, retries 5 times and doesn't wait between retries. Otherwise, the
+    first retry waits ``wait`` seconds, and each one after that waits a random
+    time between ``wait`` and an upper bound which grows by a factor of ``backoff``,
+    capped at ``max_wait``. Exceptions in ``giveup_on`` are raised immediately.
 
     If the function never succeeds, raises ``TimeoutError`` with ``msg``.
     """
@@ -63,20 +79,24 @@ def retry(
         is_desired_value = partial(operator.eq, cond)
 
     def decorator(f: Callable):
+        @wraps(f)
         def retry_f(*args, **kwargs):
             if n < 1:
                 raise ValueError(f"Retries must be positive, non-zero integer: {n}")
             error = None
             # + 1 because we want 1 initial try, and then retry n times
-            for i in range(total_attempts := n + 1):
+            for i in range(n + 1):
                 try:
                     if is_desired_value(res := f(*args, **kwargs)):
                         return res
+                except giveup_on:
+                    raise
                 except Exception as e:
                     error = e
                 # Don't sleep after the last attempt
-                if i < total_attempts:
-                    time.sleep(wait)
+                if i < n:
+                    # Jitter keeps concurrent callers from retrying in lockstep
+                    time.sleep(random.uniform(wait, min(max_wait, wait * backoff**i)))
 
             if error:
                 raise error
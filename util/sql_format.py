@@ -4,44 +4,50 @@ from logging import Formatter
 
 from django.conf import settings
 
+# Check if Pygments is available for coloring
+try:
+    import pygments
+    from pygments.lexers import SqlLexer
+    from pygments.formatters import TerminalTrueColorFormatter
+except ImportError:
+    pygments = None
+
+# Check if sqlparse is available for indentation
+try:
+    import sqlparse
+except ImportError:
+    sqlparse = None
+
+# The lexer and formatter are stateless, so they are shared by every record
+if pygments:
+    SQL_LEXER = SqlLexer()
+    SQL_TERMINAL_FORMATTER = TerminalTrueColorFormatter(style="monokai")
+
+
+def format_sql(sql: str) -> str:
+    """Indent and highlight a query."""
+    if sqlparse:
+        # Indent the SQL query
+        sql = sqlparse.format(
+            sql,
+            wrap_after=settings.CONSOLE_WIDTH,
+            indent_width=settings.CONSOLE_INDENT,
+            output_format="python",
+        )
+
+    if pygments:
+        # Highlight the SQL query
+        sql = pygments.highlight(sql, SQL_LEXER, SQL_TERMINAL_FORMATTER)
+
+    return sql
+
 
 class SQLFormatter(Formatter):
     """Color code with pygments, format with sqlparse."""
 
     def format(self, record):
         """Do the formatting."""
-        # Check if Pygments is available for coloring
-        try:
-            import pygments
-            from pygments.lexers import SqlLexer
-            from pygments.formatters import TerminalTrueColorFormatter
-        except ImportError:
-            pygments = None
-
-        # Check if sqlparse is available for indentation
-        try:
-            import sqlparse
-        except ImportError:
-            sqlparse = None
-
-        # Remove leading and trailing whitespaces
-        sql = record.sql.strip()
-
-        if sqlparse:
-            # Indent the SQL query
-            sql = sqlparse.format(
-                sql,
-                wrap_after=settings.CONSOLE_WIDTH,
-                indent_width=settings.CONSOLE_INDENT,
-                output_format="python",
-            )
-
-        if pygments:
-            # Highlight the SQL query
-            sql = pygments.highlight(
-                sql, SqlLexer(), TerminalTrueColorFormatter(style="monokai")
-            )
-
-        # Set the record's statement to the formatted query
-        record.statement = sql
+        # Set the record's statement to the formatted query, without leading and
+        # trailing whitespace
+        record.statement = format_sql(record.sql.strip())
         return super(SQLFormatter, self).format(record)
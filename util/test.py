@@ -8,12 +8,15 @@ import datetime
 import logging
 import os
 import random
+from collections import Counter, defaultdict
+from itertools import accumulate, count
 from typing import Union, Optional, Iterable, Any
 from uuid import uuid4
 
-import faker.config
+import faker
 from django.conf import settings
 from django.db import models, transaction, IntegrityError
+from django.db.models import Max
 from django.test.runner import DiscoverRunner
 from django.utils import timezone
 
@@ -30,31 +33,62 @@ from trovi.models import (
 
 
 def cut_string(s: str, max_length: int) -> str:
-    return s[: min(len(s), max_length)]
+    # Slicing already stops at the end of the string, and returns the string itself
+    # when it is short enough
+    return s[:max_length]
 
 
 logging.getLogger("faker.factory").setLevel(logging.INFO)
-fake = faker.Faker(faker.config.AVAILABLE_LOCALES)
+# Loading every available locale takes over a second and isn't needed for test data.
+# These are the fewest locales which provide all the generators used below.
+fake = faker.Faker(["en_US", "en_PH", "fr_FR"])
+
+# The proxy picks a locale for every attribute lookup, so binding a generator from it
+# would pin one random locale for the whole run. UUIDs and booleans are the same in
+# every locale, so those are bound once from a single locale instead.
+fake_uuid4 = fake["en_US"].uuid4
+fake_boolean = fake["en_US"].boolean
+
+# Names of the providers each kind of value is drawn from
+EMAIL_PROVIDERS = (
+    "email",
+    "free_email",
+    "safe_email",
+    "ascii_email",
+    "company_email",
+    "ascii_company_email",
+    "ascii_free_email",
+    "ascii_safe_email",
+)
+REPO_NAME_PROVIDERS = ("domain_name", "user_name", "random_object_name", "slug")
+AFFILIATION_PROVIDERS = ("company", "building_name")
+TAG_PROVIDERS = (
+    "domain_word",
+    "department_name",
+    "company",
+    "name",
+    "domain_name",
+    "random_int",
+)
+
+# Generating text is one of Faker's slowest providers, so tags are drawn from a pool.
+# The pool comes from a single locale, since the proxy would otherwise pick one at
+# random, and some locales have fewer unique words than the pool needs.
+TAG_POOL = [
+    cut_string(word, settings.ARTIFACT_TAG_MAX_CHARS)
+    for word in fake["en_US"].words(nb=500, unique=True)
+]
 
 CHI_SITES = ["TACC", "UC", "NU"]
 
 
+def fake_from(providers: tuple[str, ...]) -> str:
+    """Calls a random provider from ``providers``, in a random locale which has it"""
+    return str(getattr(fake, random.choice(providers))())
+
+
 def fake_email() -> str:
-    return cut_string(
-        random.choice(
-            [
-                fake.email,
-                fake.free_email,
-                fake.safe_email,
-                fake.ascii_email,
-                fake.company_email,
-                fake.ascii_company_email,
-                fake.ascii_free_email,
-                fake.ascii_safe_email,
-            ]
-        )(),
-        settings.EMAIL_ADDRESS_MAX_CHARS,
-    )
+    return cut_string(fake_from(EMAIL_PROVIDERS), settings.EMAIL_ADDRESS_MAX_CHARS)
 
 
 def fake_github_user() -> str:
@@ -64,46 +98,31 @@ def fake_github_user() -> str:
 
 def fake_github_repo() -> str:
     return cut_string(
-        random.choice(
-            [
-                fake.domain_name,
-                fake.user_name,
-                fake.random_object_name,
-                fake.slug,
-            ]
-        )(),
-        settings.GITHUB_REPO_NAME_MAX_CHARS,
+        fake_from(REPO_NAME_PROVIDERS), settings.GITHUB_REPO_NAME_MAX_CHARS
     )
 
 
 def fake_git_ref() -> str:
-    if not fake.boolean(chance_of_getting_true=80):
+    if not fake_boolean(chance_of_getting_true=80):
         return ""
-    else:
-        use_commit_id = fake.boolean(chance_of_getting_true=40)
-        git_hash = fake.sha1()
-        return (
-            "@"
-            + random.choice(
-                [
-                    lambda: cut_string(fake.slug(), settings.GIT_BRANCH_NAME_MAX_CHARS),
-                    lambda: git_hash[: 7 if use_commit_id else len(git_hash)],
-                ]
-            )()
-        )
+    # The kinds of ref are picked by index, so no closures are built for each call
+    if random.randrange(2) == 0:
+        return "@" + cut_string(fake.slug(), settings.GIT_BRANCH_NAME_MAX_CHARS)
+    git_hash = fake.sha1()
+    if fake_boolean(chance_of_getting_true=40):
+        return "@" + git_hash[:7]
+    return "@" + git_hash
 
 
 def fake_contents_urn() -> str:
+    backend = random.randrange(3)
+    if backend == 0:
+        return f"urn:trovi:contents:chameleon:{fake_uuid4()}"
+    elif backend == 1:
+        return f"urn:trovi:contents:zenodo:{fake.doi()}"
     return (
-        "urn:trovi:contents:"
-        + random.choice(
-            [
-                lambda: f"chameleon:{fake.uuid4()}",
-                lambda: f"zenodo:{fake.doi()}",
-                lambda: f"github:{fake_github_user()}/{fake_github_repo()}"
-                f"{fake_git_ref()}",
-            ]
-        )()
+        f"urn:trovi:contents:github:{fake_github_user()}/{fake_github_repo()}"
+        f"{fake_git_ref()}"
     )
 
 
@@ -111,41 +130,36 @@ def fake_user_urn() -> str:
     return f"urn:trovi:user:chameleon:{fake_email()}"
 
 
+# Project IDs count up from a random start, so their URNs stay unique without Faker
+# having to track and retry every value it has returned, and the IDs never run out
+PROJECT_IDS = count(random.randint(1, 999999))
+
+
 def fake_project_urn() -> str:
-    return f"urn:trovi:chameleon:CHI-{fake.unique.random_int(1, 999999)}"
+    return f"urn:trovi:chameleon:CHI-{next(PROJECT_IDS)}"
 
 
 def fake_link_urn() -> str:
-    return (
-        "urn:"
-        + random.choice(
-            [
-                lambda: f"trovi:chameleon:disk-image:CHI@{random.choice(CHI_SITES)}:{fake.uuid4()}",
-                # TODO unsure of how fabric data should be formatted
-                # lambda: f"disk-image:fabric:{fake.slug()}:{fake.uuid4()}",
-                lambda: f"globus:dataset:{fake.uuid4()}:{fake.uri_path()}",
-                lambda: f"trovi:chameleon:dataset:CHI@{random.choice(CHI_SITES)}:{fake.uuid4()}:"
-                f"{fake.uri_path()}",
-                lambda: f"trovi:dataset:zenodo:{fake.doi()}:{fake.uri_path()}",
-            ]
-        )()
-    )
+    # TODO unsure of how fabric data should be formatted
+    # f"urn:disk-image:fabric:{fake.slug()}:{fake_uuid4()}"
+    link_type = random.randrange(4)
+    if link_type == 0:
+        return (
+            f"urn:trovi:chameleon:disk-image:CHI@{random.choice(CHI_SITES)}:"
+            f"{fake_uuid4()}"
+        )
+    elif link_type == 1:
+        return f"urn:globus:dataset:{fake_uuid4()}:{fake.uri_path()}"
+    elif link_type == 2:
+        return (
+            f"urn:trovi:chameleon:dataset:CHI@{random.choice(CHI_SITES)}:"
+            f"{fake_uuid4()}:{fake.uri_path()}"
+        )
+    return f"urn:trovi:dataset:zenodo:{fake.doi()}:{fake.uri_path()}"
 
 
 def fake_tag() -> str:
-    return cut_string(
-        random.choice(
-            [
-                fake.domain_word,
-                fake.department_name,
-                fake.company,
-                fake.name,
-                fake.domain_name,
-                lambda: str(fake.random_int()),
-            ]
-        )(),
-        settings.ARTIFACT_TAG_MAX_CHARS,
-    )
+    return cut_string(fake_from(TAG_PROVIDERS), settings.ARTIFACT_TAG_MAX_CHARS)
 
 
 # Sample Artifacts which define expected input
@@ -236,10 +250,21 @@ don_quixote = [
 ]
 
 
+# Only ever unpacked into model kwargs, so every unverified link can share it
+UNVERIFIED = {"verified": False, "verified_at": None}
+
+
+def fake_verified() -> dict[str, Union[bool, Optional[datetime.datetime]]]:
+    """Generates random but correct verification attributes for a link"""
+    if not fake_boolean(chance_of_getting_true=20):
+        return UNVERIFIED
+    return {"verified": True, "verified_at": fake.date_time(tzinfo=timezone.utc)}
+
+
 def generate_fake_artifact() -> list[models.Model]:
     """Generates a fake artifact with a random series of attributes"""
     artifact = Artifact(
-        uuid=fake.uuid4(),
+        uuid=fake_uuid4(),
         title=fake.text(max_nb_chars=settings.ARTIFACT_TITLE_MAX_CHARS),
         short_description=fake.text(
             max_nb_chars=settings.ARTIFACT_SHORT_DESCRIPTION_MAX_CHARS
@@ -262,7 +287,7 @@ def generate_fake_artifact() -> list[models.Model]:
             artifact=artifact,
             full_name=cut_string(fake.name(), settings.ARTIFACT_AUTHOR_NAME_MAX_CHARS),
             affiliation=cut_string(
-                random.choice([fake.company, fake.building_name])(),
+                fake_from(AFFILIATION_PROVIDERS),
                 settings.ARTIFACT_AUTHOR_AFFILIATION_MAX_CHARS,
             ),
             email=fake_email(),
@@ -274,46 +299,30 @@ def generate_fake_artifact() -> list[models.Model]:
             artifact_version=random.choice(artifact_versions),
             event_type=random.choice(ArtifactEvent.EventType.values),
             event_origin=(
-                None if fake.boolean(chance_of_getting_true=90) else fake_user_urn()
+                None if fake_boolean(chance_of_getting_true=90) else fake_user_urn()
             ),
         )
         for _ in range(random.randint(0, 40))
     ]
 
-    def _verified() -> dict[str, Union[bool, Optional[datetime.datetime]]]:
-        # Generates random but correct verification attributes for a link
-        verified = fake.boolean(chance_of_getting_true=20)
-        return {
-            "verified": verified,
-            "verified_at": (
-                None
-                if not verified
-                else fake.date_time_between(
-                    datetime.date.min, datetime.date.max, timezone.utc
-                )
-            ),
-        }
-
     artifact_links = [
         ArtifactLink(
             artifact_version=random.choice(artifact_versions),
             urn=fake_link_urn(),
             label=fake.text(max_nb_chars=settings.ARTIFACT_LINK_LABEL_MAX_CHARS),
-            **_verified(),
+            **fake_verified(),
         )
         for _ in range(random.randint(0, 3))
     ]
 
     # The value returned is a single flat list of all the models just created
-    return [artifact] + sum(
-        [
-            artifact_versions,
-            artifact_authors,
-            artifact_events,
-            artifact_links,
-        ],
-        start=[],
-    )
+    return [
+        artifact,
+        *artifact_versions,
+        *artifact_authors,
+        *artifact_events,
+        *artifact_links,
+    ]
 
 
 def generate_many_to_many(artifacts: Iterable[Artifact]):
@@ -322,11 +331,10 @@ def generate_many_to_many(artifacts: Iterable[Artifact]):
     This function should only be called after the test artifacts
     have already been saved.
     """
+    # Sampling without replacement keeps the tags unique
     tags = [
-        ArtifactTag.objects.create(
-            tag=fake.text(max_nb_chars=settings.ARTIFACT_TAG_MAX_CHARS)
-        )
-        for _ in range(random.randint(5, 20))
+        ArtifactTag.objects.create(tag=tag)
+        for tag in random.sample(TAG_POOL, k=random.randint(5, 20))
     ]
 
     projects = [
@@ -334,21 +342,86 @@ def generate_many_to_many(artifacts: Iterable[Artifact]):
         for _ in range(random.randint(1, 10))
     ]
 
-    # Randomly weigh the attributes to simulate some being more popular than others
-    weights_tags = [random.random() for _ in tags]
-    weights_projects = [random.random() for _ in projects]
+    # Randomly weigh the attributes to simulate some being more popular than others.
+    # The weights are accumulated once, rather than by choices() for every artifact.
+    weights_tags = list(accumulate(random.random() for _ in tags))
+    weights_projects = list(accumulate(random.random() for _ in projects))
 
+    # The relations are collected as sets, since choices() can pick the same
+    # attribute more than once for an artifact, and then inserted all at once
+    artifact_tags = set()
+    artifact_projects = set()
     for artifact in artifacts:
         k_tags = random.randint(0, len(tags))
-        if k_tags:
-            # Apply the tags randomly to artifacts
-            artifact.tags.add(*random.choices(tags, weights=weights_tags, k=k_tags))
+        # Apply the tags randomly to artifacts
+        artifact_tags.update(
+            (artifact.pk, tag.pk)
+            for tag in random.choices(tags, cum_weights=weights_tags, k=k_tags)
+        )
         k_projects = random.randint(1, len(projects))
         # Apply the projects randomly to artifacts
-        artifact.linked_projects.add(
-            *random.choices(projects, weights=weights_projects, k=k_projects)
+        artifact_projects.update(
+            (artifact.pk, project.pk)
+            for project in random.choices(
+                projects, cum_weights=weights_projects, k=k_projects
+            )
         )
 
+    tag_through = ArtifactTag.artifacts.through
+    tag_through.objects.bulk_create(
+        tag_through(artifact_id=artifact_id, artifacttag_id=tag_id)
+        for artifact_id, tag_id in artifact_tags
+    )
+    project_through = ArtifactProject.artifacts.through
+    project_through.objects.bulk_create(
+        project_through(artifact_id=artifact_id, artifactproject_id=project_id)
+        for artifact_id, project_id in artifact_projects
+    )
+
+
+def bulk_save_models(all_models: Iterable[models.Model]):
+    """
+    Saves generated models with one bulk insert per model type, in the order their
+    foreign keys require. Bulk inserts skip ``save()`` and signals, so the version
+    slugs and artifact access counts those would have set are filled in here.
+    ``TestSampleData`` checks these against the models' own signal handlers.
+    """
+    by_type = defaultdict(list)
+    for model in all_models:
+        by_type[type(model)].append(model)
+
+    # Events and links refer to versions by primary key, but bulk_create only sets
+    # auto-incremented keys on SQLite 3.35 and later, so versions are numbered here
+    last_version_id = ArtifactVersion.objects.aggregate(Max("id"))["id__max"] or 0
+    for version_id, version in enumerate(
+        by_type[ArtifactVersion], last_version_id + 1
+    ):
+        version.id = version_id
+
+    # Mirrors ArtifactVersion.generate_slug
+    versions_per_day = Counter()
+    for version in by_type[ArtifactVersion]:
+        day = version.created_at.date()
+        slug = version.created_at.strftime("%Y-%m-%d")
+        if versions_today := versions_per_day[version.artifact.uuid, day]:
+            slug += f".{versions_today}"
+        versions_per_day[version.artifact.uuid, day] += 1
+        version.slug = slug
+
+    # Mirrors ArtifactEvent.incr_access_count
+    for event in by_type[ArtifactEvent]:
+        if event.event_type == ArtifactEvent.EventType.LAUNCH:
+            event.artifact_version.artifact.access_count += 1
+
+    for model_type in (
+        Artifact,
+        ArtifactVersion,
+        ArtifactAuthor,
+        ArtifactEvent,
+        ArtifactLink,
+    ):
+        model_type.objects.bulk_create(by_type[model_type])
+
 
 def make_admin(artifact: Artifact) -> Artifact:
     artifact.roles.create(
@@ -364,13 +437,14 @@ class SampleDataTestRunner(DiscoverRunner):
     def setup_databases(self, **kwargs) -> list[Any]:
         names = super(SampleDataTestRunner, self).setup_databases(**kwargs)
         print("Generating test data...")
-        all_models = sum([generate_fake_artifact() for _ in range(100)], start=[])
+        all_models = [model for _ in range(100) for model in generate_fake_artifact()]
         try:
             with transaction.atomic():
+                # The sample artifact is saved normally, since tests check the
+                # exact values its signals produce
                 for model in don_quixote:
                     model.save()
-                for model in all_models:
-                    model.save()
+                bulk_save_models(all_models)
                 generate_many_to_many(
                     Artifact.objects.exclude(uuid=artifact_don_quixote.uuid)
                 )
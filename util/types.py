@@ -1,29 +1,32 @@
 import mmap
 from collections import namedtuple
-from typing import Union, Protocol, Type, Dict
+from typing import Union, Protocol, Type, Dict, TYPE_CHECKING
 
 from django.db import models
 
+if TYPE_CHECKING:
 
-class JSONArray(Protocol):
-    __class__: Type[list["JSON"]]
+    class JSONArray(Protocol):
+        __class__: Type[list["JSON"]]
 
+    class JSONObject(Protocol):
+        __class__: Type[dict[str, "JSON"]]
 
-class JSONObject(Protocol):
-    __class__: Type[dict[str, "JSON"]]
+    class JSONPrimitive(Protocol):
+        __class__: Type[Union[None, float, int, str]]
 
+    class APISerializable(Protocol):
+        __class__: Type[Union[models.Field, models.Manager, "APIObject"]]
 
-class JSONPrimitive(Protocol):
-    __class__: Type[Union[None, float, int, str]]
-
+else:
+    # The protocols only matter to type checkers, so at runtime the names are bound
+    # to the types they describe, rather than building the protocols on every import
+    JSONArray = list
+    JSONObject = dict
+    JSONPrimitive = Union[None, float, int, str]
+    APISerializable = Union[models.Field, models.Manager, dict]
 
 JSON = Union[JSONPrimitive, JSONArray, JSONObject]
-
-
-class APISerializable(Protocol):
-    __class__: Type[Union[models.Field, models.Manager, "APIObject"]]
-
-
 APIObject = Dict[str, Union[APISerializable, JSON]]
 
 # Dumb type used to modify request bodies
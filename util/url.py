@@ -1,8 +1,19 @@
+import re
+from functools import lru_cache
 from urllib.parse import urlparse
 
+# Matches the network location of URLs with a scheme, which covers every URL this
+# is used for without building a full ParseResult
+NETLOC_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.\-]*://([^/?#]*)")
 
+
+@lru_cache(maxsize=1024)
 def url_to_fqdn(url: str) -> str:
     """
-    Extracts the FQDN from a URL.
+    Extracts the FQDN from a URL. The same few issuer URLs are looked up over and
+    over, so results are cached.
     """
+    match = NETLOC_PATTERN.match(url)
+    if match:
+        return match.group(1)
     return urlparse(url).netloc
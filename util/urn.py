@@ -1,22 +1,20 @@
-def parse_project_urn(project_urn):
-    provider, project_id = project_urn.split(":", 4)[3:]
-    return {
-        "provider": provider,
-        "id": project_id,
-    }
+import re
+
+# Every URN is of the form urn:<namespace>:<type>:<provider>:<id>, and the id may
+# itself contain colons. URNs are validated case-insensitively, and the id may be
+# empty, so neither is rejected here.
+URN_PATTERN = re.compile(r"^urn:[^:]*:[^:]*:([^:]*):(.*)$", re.IGNORECASE | re.DOTALL)
 
 
-def parse_owner_urn(owner_urn):
-    provider, owner_id = owner_urn.split(":", 4)[3:]
+def parse_urn(urn):
+    match = URN_PATTERN.match(urn)
+    if not match:
+        raise ValueError(f"Invalid URN: {urn}")
+    provider, urn_id = match.groups()
     return {
         "provider": provider,
-        "id": owner_id,
+        "id": urn_id,
     }
 
 
-def parse_contents_urn(contents_urn):
-    provider, contents_id = contents_urn.split(":", 4)[3:]
-    return {
-        "provider": provider,
-        "id": contents_id,
-    }
+parse_project_urn = parse_owner_urn = parse_contents_urn = parse_urn